@@ -0,0 +1,84 @@
+"""
+Latency benchmark for the dashboard read path against a local Postgres.
+
+Usage:
+    DATABASE_URL=postgresql://postgres@localhost:5432/postgres DB_SSLMODE=disable python bench_dashboard.py
+"""
+import os
+import time
+import statistics
+
+os.environ.setdefault("DB_SSLMODE", "disable")
+
+import database
+
+BENCH_EMAIL = "bench@example.com"
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "200"))
+MAX_COMPANIES = 5
+
+
+def timed(fn, rounds=ROUNDS):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<32} median {statistics.median(samples):7.3f} ms | p95 {p95:7.3f} ms")
+
+
+def old_index_read():
+    # ההתנהגות הקודמת: שאילתה ל-DB בכל רינדור של העמוד
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM companies WHERE user_email = %s', (BENCH_EMAIL,))
+    cursor.fetchall()
+    conn.close()
+
+
+def old_add_at_limit():
+    # ההתנהגות הקודמת: SELECT לבדיקת המגבלה ואז (אם יש מקום) INSERT
+    old_index_read()
+
+
+def new_add_at_limit():
+    database.add_company("Bench", "https://example.com/careers", BENCH_EMAIL, MAX_COMPANIES)
+
+
+def main():
+    database.init_db()
+
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM companies WHERE user_email = %s', (BENCH_EMAIL,))
+    conn.commit()
+    conn.close()
+    database.invalidate_user_companies(BENCH_EMAIL)
+
+    for i in range(MAX_COMPANIES):
+        database.add_company(f"Bench {i}", f"https://example.com/careers/{i}", BENCH_EMAIL, MAX_COMPANIES)
+
+    print(f"⏱️ {ROUNDS} rounds per case\n")
+    report("index: uncached read", timed(old_index_read))
+
+    database.get_companies_by_user(BENCH_EMAIL)
+    report("index: cached read", timed(lambda: database.get_companies_by_user(BENCH_EMAIL)))
+
+    report("add at limit: check only (old)", timed(old_add_at_limit))
+    report("add at limit: conditional insert", timed(new_add_at_limit))
+
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM companies WHERE user_email = %s', (BENCH_EMAIL,))
+    conn.commit()
+    conn.close()
+    database.invalidate_user_companies(BENCH_EMAIL)
+
+
+if __name__ == "__main__":
+    main()
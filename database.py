@@ -1,5 +1,7 @@
 import os
 import time
+import threading
+from collections import OrderedDict
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
@@ -8,10 +10,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# ברירת מחדל: חיבור מאובטח (Neon). ל-Postgres מקומי אפשר להגדיר DB_SSLMODE=disable
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
+# כמה שניות רשימת החברות של משתמש נשמרת בזיכרון לפני קריאה חוזרת מה-DB
+COMPANIES_CACHE_TTL = float(os.getenv("COMPANIES_CACHE_TTL", "60"))
+# מקסימום משתמשים שנשמרים ב-cache (LRU), כדי שהזיכרון לא יגדל בלי גבול
+COMPANIES_CACHE_MAX_USERS = 1000
+
+# { user_email: (expires_at, companies) } - לפי סדר שימוש (LRU)
+_companies_cache = OrderedDict()
+# { user_email: מספר סידורי של ה-invalidation האחרון } - מונע החזרה של נתונים ישנים ל-cache
+_invalidations = OrderedDict()
+_invalidation_seq = 0
+# המספר הסידורי הגבוה ביותר שנזרק מ-_invalidations (ברירת מחדל שמרנית למפתח שלא נמצא)
+_evicted_invalidation_seq = 0
+_companies_cache_lock = threading.Lock()
 
 def get_db_connection():
-    # הוספנו את sslmode='require' כדי להכריח חיבור מאובטח
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor, sslmode='require')
+    # sslmode נקבע לפי DB_SSLMODE (ברירת מחדל 'require' - חיבור מאובטח)
+    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor, sslmode=DB_SSLMODE)
     return conn
 
 def init_db():
@@ -74,13 +91,50 @@ def init_db():
 
 
 # --- Companies ---
+def _last_invalidation(user_email):
+    # חייב להיקרא כשה-lock תפוס
+    return _invalidations.get(user_email, _evicted_invalidation_seq)
+
+def invalidate_user_companies(user_email):
+    """ מוחק את רשימת החברות של המשתמש מה-cache, כך שהקריאה הבאה תגיע ל-DB """
+    global _invalidation_seq, _evicted_invalidation_seq
+    with _companies_cache_lock:
+        _companies_cache.pop(user_email, None)
+        _invalidation_seq += 1
+        _invalidations[user_email] = _invalidation_seq
+        _invalidations.move_to_end(user_email)
+        if len(_invalidations) > COMPANIES_CACHE_MAX_USERS:
+            _, seq = _invalidations.popitem(last=False)
+            _evicted_invalidation_seq = max(_evicted_invalidation_seq, seq)
+
 def get_companies_by_user(user_email):
+    """ read-through cache: מחזיר מהזיכרון אם לא פג תוקף, אחרת שולף מה-DB """
+    with _companies_cache_lock:
+        cached = _companies_cache.get(user_email)
+        if cached and cached[0] > time.monotonic():
+            _companies_cache.move_to_end(user_email)
+            return list(cached[1])
+        seq_before = _last_invalidation(user_email)
+
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM companies WHERE user_email = %s', (user_email,))
+    cursor.execute('SELECT * FROM companies WHERE user_email = %s ORDER BY id', (user_email,))
     companies = cursor.fetchall()
     conn.close()
-    return companies
+
+    # לא שומרים תוצאה ריקה (מייל לא מוכר), ולא שומרים אם היה invalidation בזמן השאילתה
+    if not companies:
+        return []
+    with _companies_cache_lock:
+        if _last_invalidation(user_email) == seq_before:
+            now = time.monotonic()
+            for email in [e for e, (expires_at, _) in _companies_cache.items() if expires_at <= now]:
+                del _companies_cache[email]
+            _companies_cache[user_email] = (now + COMPANIES_CACHE_TTL, companies)
+            _companies_cache.move_to_end(user_email)
+            while len(_companies_cache) > COMPANIES_CACHE_MAX_USERS:
+                _companies_cache.popitem(last=False)
+    return list(companies)
 
 def get_all_companies_for_scan():
     conn = get_db_connection()
@@ -90,19 +144,32 @@ def get_all_companies_for_scan():
     conn.close()
     return companies
 
-def add_company(name, url, user_email):
+def add_company(name, url, user_email, max_companies):
+    """
+    מוסיף חברה רק אם למשתמש יש פחות מ-max_companies, ב-round trip אחד.
+    ה-advisory lock לפי המייל מונע משתי הוספות במקביל לעבור את המגבלה יחד.
+    מחזיר True אם נוספה, False אם הגיע למגבלה, None במקרה של שגיאה.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            'INSERT INTO companies (name, careers_url, user_email) VALUES (%s, %s, %s)', 
-            (name, url, user_email)
-        )
+        cursor.execute('''
+            SELECT pg_advisory_xact_lock(hashtext(%s));
+            INSERT INTO companies (name, careers_url, user_email)
+            SELECT %s, %s, %s
+            WHERE (SELECT COUNT(*) FROM companies WHERE user_email = %s) < %s
+            RETURNING id
+        ''', (user_email, name, url, user_email, user_email, max_companies))
+        inserted = cursor.fetchone() is not None
         conn.commit()
     except Exception as e:
         print(f"Error adding company: {e}")
+        inserted = None
     finally:
         conn.close()
+    if inserted:
+        invalidate_user_companies(user_email)
+    return inserted
 
 def delete_company(company_id, user_email):
     conn = get_db_connection()
@@ -110,6 +177,7 @@ def delete_company(company_id, user_email):
     cursor.execute('DELETE FROM companies WHERE id = %s AND user_email = %s', (company_id, user_email))
     conn.commit()
     conn.close()
+    invalidate_user_companies(user_email)
 
 # --- Users (UPDATED) ---
 def add_user(email, interests_str="", region="Other"):
@@ -154,6 +222,7 @@ def remove_user(email):
     cursor.execute('DELETE FROM users WHERE email = %s', (email,))
     conn.commit()
     conn.close()
+    invalidate_user_companies(email)
 
 def get_users():
     conn = get_db_connection()
@@ -26,6 +26,8 @@ app = FastAPI(lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
+MAX_COMPANIES_PER_USER = 5
+
 
 # ✅ Wrapper so BackgroundTasks can run the async scraper safely
 def start_scraper_task():
@@ -76,13 +78,6 @@ async def add_company(
     url: str = Form(...), 
     user_email: str = Form(...)
 ):
-    user_companies = database.get_companies_by_user(user_email)
-    if len(user_companies) >= 5: 
-        return RedirectResponse(
-            url=f"/?view_email={user_email}&error_message=✋ Limit Reached. Max 5 companies allowed.", 
-            status_code=303
-        )
-
     valid_keywords = ["career", "jobs", "job", "position", "work", "join", "team", "opportunities", "vacancy", "location", "about"]
     if not any(keyword in url.lower() for keyword in valid_keywords):
         return RedirectResponse(
@@ -90,7 +85,18 @@ async def add_company(
             status_code=303
         )
 
-    database.add_company(name, url, user_email)
+    # בדיקת המגבלה וההוספה מתבצעות בשאילתה אחת ב-DB
+    added = database.add_company(name, url, user_email, MAX_COMPANIES_PER_USER)
+    if added is False:
+        return RedirectResponse(
+            url=f"/?view_email={user_email}&error_message=✋ Limit Reached. Max {MAX_COMPANIES_PER_USER} companies allowed.", 
+            status_code=303
+        )
+    if added is None:
+        return RedirectResponse(
+            url=f"/?view_email={user_email}&error_message=⚠️ Could not add company. Please try again.", 
+            status_code=303
+        )
     return RedirectResponse(url=f"/?view_email={user_email}", status_code=303)
 
 